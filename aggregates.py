@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+QUANTILES = [.1, .25, .5, .75, .9]
+AVAILABILITY_PERCENTILES = [.1, .25, .5, .75, .9, .99]
+CHEAP_PRICE = 100
+
+
+def price_summary(df, by):
+  """Counts, sums, means and quantiles of price per group
+  in:  dataframe, grouping column(s)
+  out: dataframe indexed by group
+  """
+  grouped = df.groupby(by, observed=True)["price"]
+  summary = grouped.agg(["count", "sum", "mean", "min", "max"])
+
+  quantiles = grouped.quantile(QUANTILES).unstack()
+  quantiles.columns = [f"p{int(q * 100)}" for q in quantiles.columns]
+
+  return summary.join(quantiles)
+
+
+def room_type_shares(df):
+  """Quantity and percentage of each room type inside each district
+  in:  dataframe
+  out: dataframe with District, Room Type, Quantity and Percentage
+  """
+  shares = df.groupby(["neighbourhood_group", "room_type"], observed=True).size().reset_index(name="Quantity")
+  shares = shares.rename(columns={"neighbourhood_group": "District", "room_type": "Room Type"})
+  shares["Percentage"] = 100 * shares.Quantity / shares.groupby("District", observed=True).Quantity.transform("sum")
+  return shares
+
+
+def top_hosts(df, k=5):
+  """Leaderboard of the k hosts with most reviewed listings. Counting is a
+  single vectorized pass and nlargest only orders the k winners
+  in:  dataframe, leaderboard size
+  out: dataframe with host_name and number_of_reviews
+  """
+  counts = df.host_name[df.number_of_reviews.notnull().to_numpy()].value_counts(sort=False).nlargest(k)
+  return counts.rename_axis("host_name").reset_index(name="number_of_reviews")
+
+
+def availability_index(df):
+  """Sorted availability_365 values of the listed (availability > 0) rows
+  per district, for all listings and for those priced below CHEAP_PRICE
+  in:  dataframe
+  out: {district: {"all": array, "cheap": array}}
+  """
+  # districts without any listed row still answer, with empty arrays
+  empty = np.array([], dtype=df.availability_365.dtype)
+  index = {district: {"all": empty, "cheap": empty}
+           for district in df.neighbourhood_group.astype("category").cat.categories}
+
+  listed = df[df.availability_365.to_numpy() > 0]
+  for district, rows in listed.groupby("neighbourhood_group", observed=True):
+    index[district] = {
+      "all": np.sort(rows.availability_365.to_numpy()),
+      "cheap": np.sort(rows.availability_365.to_numpy()[rows.price.to_numpy() < CHEAP_PRICE]),
+    }
+  return index
+
+
+def _quantile(values, q):
+  # linear interpolation over an already sorted array, as Series.quantile does
+  position = q * (len(values) - 1)
+  lo = int(np.floor(position))
+  hi = min(lo + 1, len(values) - 1)
+  return values[lo] + (values[hi] - values[lo]) * (position - lo)
+
+
+def describe_sorted(values, name, percentiles=AVAILABILITY_PERCENTILES):
+  """Series.describe of a sorted array, reading percentiles by position
+  in:  sorted numpy array, row name, percentiles
+  out: one row dataframe
+  """
+  stats = {"count": float(len(values))}
+  if len(values):
+    stats.update(mean=values.mean(), std=values.std(ddof=1) if len(values) > 1 else np.nan, min=values[0])
+    stats.update({f"{q * 100:g}%": _quantile(values, q) for q in percentiles})
+    stats.update(max=values[-1])
+  return pd.DataFrame([stats], index=[name])
+
+
+def price_counts(df):
+  """Number of listings at each whole dollar price
+  in:  dataframe
+  out: numpy array indexed by price
+  """
+  return np.bincount(df.price.dropna().to_numpy().astype("int64").clip(0))
+
+
+def histogram_bins(counts, lo, hi, nbins=100):
+  """Regroups the per dollar counts of [lo, hi] into at most nbins equal bins
+  in:  price_counts output, price range, number of bins
+  out: dataframe with the bin start, width and listings
+  """
+  start, stop = int(np.ceil(max(lo, 0))), int(np.floor(hi)) + 1
+  fine = counts[start:stop]
+  width = max(1, int(np.ceil(len(fine) / nbins)))
+
+  padded = np.zeros(int(np.ceil(len(fine) / width)) * width, dtype="int64")
+  padded[:len(fine)] = fine
+  listings = padded.reshape(-1, width).sum(axis=1)
+
+  return pd.DataFrame({"price": start + width * np.arange(len(listings)), "width": width, "listings": listings})
+
+
+def build_aggregates(df):
+  """Widget independent aggregates used by the chart sections
+  in:  dataframe
+  out: dict of dataframes and arrays
+  """
+  return {
+    "district": price_summary(df, "neighbourhood_group"),
+    "room_type": price_summary(df, "room_type"),
+    "room_shares": room_type_shares(df),
+    "hosts": top_hosts(df),
+    "availability": availability_index(df),
+    "price_counts": price_counts(df),
+    "price_range": (float(df.price.min()), float(df.price.max())),
+  }
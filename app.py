@@ -1,42 +1,109 @@
 from PIL import Image
-import pandas as pd
-import matplotlib.pyplot as plt
 import streamlit as st
 import plotly.express as px
 import altair as alt
-import seaborn as sns
-sns.set_style("whitegrid")
-import base64
 import datetime
-from matplotlib import rcParams
-from  matplotlib.ticker import PercentFormatter
+import ingest
+import aggregates
+import filters
+import points
+import export
+import figures
+import store
+import search
+import profiling
+
+
+# One frame per dataset version shared by every session. It is not hashed
+# nor mutation-checked on each call, so sections must derive new frames
+# rather than write into it.
+@st.cache(allow_output_mutation=True, max_entries=1)
+def get_data(version):
+  # return pd.read_csv("http://data.insideairbnb.com/united-states/ny/new-york-city/2019-09-12/visualisations/listings.csv")
+  # version only keys the cache, the parquet file is refreshed by ingest when the csv changes
+  return ingest.load_listings()
 
+@st.cache(allow_output_mutation=True, max_entries=1)
+def get_aggregates(version):
+  return aggregates.build_aggregates(get_data(version))
 
-@st.cache
-def get_data():
-  # return pd.read_csv("http://data.insideairbnb.com/united-states/ny/new-york-city/2019-09-12/visualisations/listings.csv")
-  return pd.read_csv("data/listings.csv")
+@st.cache(allow_output_mutation=True, max_entries=1)
+def get_index(version):
+  return filters.build_index(get_data(version))
 
 @st.cache
 def get_profile_pic():
   return Image.open('profile.png')
 
-def get_table_download_link(df):
-    """Generates a link allowing the data in a given panda dataframe to be downloaded
-    in:  dataframe
-    out: href string
-    """
-    csv = df.to_csv(sep='\t', decimal=',', index=False, header=False)
-    b64 = base64.b64encode(csv.encode()).decode()  # some strings <-> bytes conversions necessary here
-    href = f'<a href="data:file/csv;base64,{b64}">Download</a>'
-    return href
-
+def get_export_link(version, columns, listing_filter, fmt):
+  rows = filters.select(get_index(version), **dict(listing_filter)).nonzero()[0]
+  return export.download_link(export.export(get_data(version), rows, list(columns), fmt), fmt)
+
+
+@st.cache(allow_output_mutation=True, max_entries=1)
+def get_search_index(version):
+  return search.build_index(get_data(version))
+
+@st.cache(max_entries=1)
+def get_history(snapshots):
+  # snapshots only keys the cache, appending one to the store invalidates it
+  return {column: store.summarize(column, dates=snapshots) for column in ["price", "availability_365"]}
+
+
+# Each section recomputes only through the cached functions below, keyed on
+# the dataset version and the widgets the section reads, so a widget change
+# only recomputes the section that owns it.
+
+@st.cache(max_entries=32)
+def get_locations(version, listing_filter):
+  df = get_data(version)
+  locations = filters.select(get_index(version), **dict(listing_filter))
+  return points.reduce_points(df.loc[locations, ["latitude", "longitude"]], "latitude", "longitude")
+
+@st.cache(allow_output_mutation=True, max_entries=32)
+def get_scatter(version, x, y, color, x_title, y_title, room_type=None):
+  df = get_data(version)
+  rows = df.last_review.notnull().to_numpy()
+  if room_type is not None:
+    rows &= filters.select(get_index(version), room_type=room_type)
+
+  fig = points.scatter(df.loc[rows, list(dict.fromkeys([x, y, color]))], x, y, color)
+  fig.update_xaxes(title=x_title)
+  fig.update_yaxes(title=y_title)
+  return fig
+
+@st.cache(allow_output_mutation=True, max_entries=32)
+def get_search(version, query, listing_filter, room_type):
+  predicates = dict(listing_filter)
+  if room_type is not None:
+    predicates["room_type"] = room_type
+  mask = filters.select(get_index(version), **predicates) if predicates else None
+  return search.search(get_search_index(version), query, mask)
+
+@st.cache(max_entries=32)
+def get_availability(version, band, neighborhood):
+  values = get_aggregates(version)["availability"][neighborhood][band]
+  return aggregates.describe_sorted(values, "availability_365")
+
+@st.cache(max_entries=32)
+def get_most_rated(version, reviews):
+  return get_data(version).iloc[filters.largest(get_index(version), "number_of_reviews", 50, hi=reviews)]\
+  [["number_of_reviews", "price", "neighbourhood", "room_type", "host_name"]]
+
+@st.cache(allow_output_mutation=True, max_entries=32)
+def get_histogram(version, values):
+  bins = aggregates.histogram_bins(get_aggregates(version)["price_counts"], *values)
+  f = px.bar(bins, x="price", y="listings", title="Price distribution")
+  f.update_traces(width=bins.width.iat[0] if len(bins) else 1, offset=0)
+  f.update_layout(bargap=0)
+  f.update_xaxes(title="Price")
+  f.update_yaxes(title="No. of listings")
+  return f
 
-def main():
-  df = get_data()
 
-  ################################ SIDEBAR ################################
+################################ SIDEBAR ################################
 
+def sidebar():
   st.sidebar.image(get_profile_pic(), use_column_width=False, width=250)
   st.sidebar.header("Welcome!")
 
@@ -54,8 +121,9 @@ def main():
   st.sidebar.markdown("**Version:** 1.0.0")
 
 
-  ################################ SUMMARY ################################
+################################ SUMMARY ################################
 
+def summary(df):
   st.title("Airbnb NY listings Data Analysis")
   st.markdown('-----------------------------------------------------')
 
@@ -78,87 +146,95 @@ def main():
 
   st.markdown("Another point about our data is that it allows sorting the dataframe upon clicking any column header, it a more flexible way to order data to visualize it.")
 
-  #################### DISTRIBUIÇÃO GEOGRÁFICA ######################
 
+#################### DISTRIBUIÇÃO GEOGRÁFICA ######################
+
+def listing_locations(df, agg, version):
   st.header("Listing Locations")
   st.markdown("Airbnb’s first New York listing was in Harlem in the year 2008, and the growth since has been exponential. Below we highlight the geographical distribution of listings. Initially we can filter them by price range, minimum number of available nights and number of reviews, so more flexibility is added when looking for a place. ")
   st.markdown("We could also filter by listing **price**, **minimum nights** on a listing or minimum of **reviews** received. ")
 
-  values = st.slider("Price Range ($)", float(df.price.min()), float(df.price.clip(upper=10000.).max()), (500., 1500.))
+  price_min, price_max = agg["price_range"]
+  values = st.slider("Price Range ($)", price_min, min(price_max, 10000.), (500., 1500.))
   min_nights_values = st.slider('Minimum Nights', 0, 30, (1))
   reviews = st.slider('Minimum Reviews', 0, 700, (0))
-  st.map(df.query(f"price.between{values} and minimum_nights<={min_nights_values} and number_of_reviews>={reviews}")[["latitude", "longitude"]].dropna(how="any"), zoom=10)
+  listing_filter = (("price", values), ("minimum_nights", (None, min_nights_values)), ("number_of_reviews", (reviews, None)))
+  locations = get_locations(version, listing_filter)
+  if locations.empty or locations["count"].max() == 1:
+    st.map(locations[["latitude", "longitude"]], zoom=10)
+  else:
+    st.pydeck_chart(points.density_map(locations, zoom=10))
 
   st.markdown("In a general way the map shows that locations in the city centre are more expensive, while the outskirts are cheaper (a pattern that probably does not only exists in New York). In addition, the city centre seems to have its own pattern.")
   st.markdown("Unsurprisingly, Manhattan island has the highest concentration of expensive Airbnbs. Some are scattered over Brooklyn too. The heftiest price tag is $10.000,00. Another likely insight is that if we know that a specific location is very close to a place we consider expensive most probably the whole sorrounding area will be expensive.")
   st.markdown("Highly rated locations also tend to be the most expensive ones. Again downtown Manhattan and adjacent areas of Brooklyn receive the highest location scores, with East Village being an exception. A marked drop in location scores is seen as the subway lines end.")
   st.markdown("In a side analysis it can be possible to see that around Manhattan there are much fewer flats than compared to areas around, in addition, most of the points of interest (_Empire State Buildind, Times Square, Central Park_) are located in ‘expensive’ areas, especially around Dam Square's district.")
   st.markdown("In Staten Island, the areas close to the State Park have the highest location scores. Brooklyn neighbourhoods close to Manhattan tend to have higher location ratings. Looking at the NY subway system in Brooklyn, it is interesting to observe that the highly rated areas correspond with subway line presence. The same is true for Bronx where subway lines do not go.")
+  return listing_filter
 
-  #################### AREAS OF INTEREST ######################
 
+#################### AREAS OF INTEREST ######################
+
+def areas_of_interest(df):
   st.header("What you looking for?")
   st.write(f"Out of the {df.shape[1]} columns, you might want to view only a subset. These are the most correlated columns to prince listing, besides that is possible filter by first interest")
   st.markdown("_**Note:** In a  more conventient way to filter our data is possible filter our data through the following features: **Price**, **Room Type**, **Minimum of Nights**, **District(Neighbourhood)**, **Host Name**, **Reviews**_")
   defaultcols = ["price", "minimum_nights", "room_type", "neighbourhood", "name", "number_of_reviews"]
   cols = st.multiselect('', df.columns.tolist(), default=defaultcols)
-  st.dataframe(df[cols].head(10))
+  st.dataframe(df.head(10)[cols])
+  return cols
+
+
+def listing_search(df, version, listing_filter, cols):
+  st.subheader("Search listings and hosts")
+  query = st.text_input("Listing name or host name")
+  if not query.strip():
+    return
+
+  room_type = st.selectbox("Search room type", ["All"] + df.room_type.cat.categories.tolist())
+  in_map_filter = st.checkbox("Only listings within the Listing Locations filters")
+  rows = get_search(version, query, listing_filter if in_map_filter else (), None if room_type == "All" else room_type)
+
+  pages = max(1, -(-len(rows) // search.PER_PAGE))
+  number = st.number_input("Page", min_value=1, max_value=pages, value=1)
+  st.write(f"{len(rows)} listings found, page {number} of {pages}.")
+  st.dataframe(df.iloc[search.page(rows, number)][cols])
 
 
-  ################################## DISTRICT ###############################
+################################## DISTRICT ###############################
 
+def districts(agg, version):
   st.header("Districts")
   st.markdown("The New York City encompasses five county-level administrative divisions called * boroughs *: ** Bronx **, ** Brooklyn **, ** Manhattan **, ** Queens ** and ** Staten Island **. Each * borough * matches a respective New York State county. The boroughs of Queens and Bronx are concurrent with the counties of the same name, while the boroughs of Manhattan, Brooklyn and Staten Island correspond to those of New York, Kings and Richmond, respectively.")
 
   st.markdown("Again unsurprisingly it is possible see that the average price in the Manhattan district can be much higher than other districts. Manhattan has an average price of twice the Bronx ")
 
-  fig = sns.barplot(x='neighbourhood_group', y='price', data=df.groupby('neighbourhood_group')['price'].mean().sort_values(ascending=False).reset_index(),
-  palette="Blues_d")
-  sns.set(font_scale = 1.5)
-  fig.set_xlabel("District",fontsize=10)
-  fig.set_ylabel("Price ($)",fontsize=10)
+  district_price = agg["district"]["mean"].rename("price").sort_values(ascending=False).reset_index()
+  st.image(figures.render(figures.district_bars, district_price, version), use_column_width=True)
 
-  st.pyplot()
 
+################### PERCENTAGE DISTRIBUTION BY DISTRICT #####################
 
-  ################### PERCENTAGE DISTRIBUTION BY DISTRICT #####################
-
+def availability(df, version):
   st.header("Availability and Distribution by District.")
   st.markdown("The **availability_365** feature mean the number of days of the year (365) listing availability. Let's check it out.")
 
-  neighborhood = st.radio("District", df.neighbourhood_group.unique())
+  neighborhood = st.radio("District", df.neighbourhood_group.cat.categories.tolist())
   is_expensive = st.checkbox("Expensive Listings")
-  is_expensive = " and price<100" if not is_expensive else ""
-
-  @st.cache
-  def get_availability(show_exp, neighborhood):
-      return df.query(f"""neighbourhood_group==@neighborhood{is_expensive}\
-          and availability_365>0""").availability_365.describe(\
-              percentiles=[.1, .25, .5, .75, .9, .99]).to_frame().T
 
-  st.table(get_availability(is_expensive, neighborhood))
+  st.table(get_availability(version, "all" if is_expensive else "cheap", neighborhood))
   st.markdown("_**Note:** There are 18431 records with **availability_365** 0 (zero), which I've ignored._")
   st.markdown("At 170 days, Brooklyn has the lowest average availability. At 224, Staten Island has the highest average availability. If we include expensive listings (more tha $100 in a listing), the numbers are 171 and 230 respectively.")
 
-  ###################### QUANTITY OF ROOM TYPES BY DISTRICT #######################
-
-  st.markdown("Following, let's check the relationship between property type and neighbourhood. The primary question we aim to answer is whether different boroughs constitute of different rental types. Though in the expanded dataset there are more than 20 types, we will be focussing on the top 4 by their total count in the city and understanding their distribution in each borough.")
 
-  room_types_df = df.groupby(['neighbourhood_group', 'room_type']).size().reset_index(name='Quantity')
-  room_types_df = room_types_df.rename(columns={'neighbourhood_group': 'District', 'room_type':'Room Type'})
-  room_types_df['Percentage'] = room_types_df.groupby(['District'])['Quantity'].apply(lambda x:100 * x / float(x.sum()))
-
-  sns.set_style("whitegrid")
-  sns.set(rc={'figure.figsize':(11.7,8.27)})
-  fig = sns.catplot(y='Percentage', x='District', hue="Room Type", data=room_types_df, height=6, kind="bar", palette="muted", ci=95);
-  fig.set(ylim=(0, 100))
+###################### QUANTITY OF ROOM TYPES BY DISTRICT #######################
 
+def room_types(agg, version):
+  st.markdown("Following, let's check the relationship between property type and neighbourhood. The primary question we aim to answer is whether different boroughs constitute of different rental types. Though in the expanded dataset there are more than 20 types, we will be focussing on the top 4 by their total count in the city and understanding their distribution in each borough.")
 
-  for ax in fig.axes.flat:
-      ax.yaxis.set_major_formatter(PercentFormatter(100))
-  plt.show()
+  room_types_df = agg["room_shares"]
 
-  st.pyplot()
+  st.image(figures.render(figures.room_type_bars, room_types_df, version, figsize=(8, 6), font_scale=1.5), use_column_width=True)
 
   st.markdown("The plot shows the ratio of property type and the total number of properties in the borough.")
 
@@ -175,13 +251,14 @@ def main():
   st.markdown(" - Manhattan has nearly 1.55% of **Hotel Room** listings. Next is Queens with 6.83% **Hotel Room** listings followed by Brooklyn with 3.32%. The other tree borough does not present any **Hotel Room** listings.")
 
 
-  ###################### PRICE AVERAGE BY ACOMMODATION #########################
+###################### PRICE AVERAGE BY ACOMMODATION #########################
 
+def average_price(agg):
   st.header("Average price by room type")
 
   st.markdown("To listings based on room type, we can show price average grouped by borough.")
 
-  avg_price_room = df.groupby("room_type").price.mean().reset_index()\
+  avg_price_room = agg["room_type"]["mean"].rename("price").reset_index()\
       .round(2).sort_values("price", ascending=False)\
       .assign(avg_price=lambda x: x.pop("price").apply(lambda y: "%.2f" % y))
 
@@ -192,110 +269,101 @@ def main():
   st.markdown("Despite together **Hotel Room** listings represent just over 10%, they are responsible for the highest price average, followed by **Entire home/apt**. Thus there are a small number of **Hotel Room** listings due its expensive prices.")
 
 
-  ############################ MOST RATED HOSTS #############################
+############################ MOST RATED HOSTS #############################
 
+def most_rated_hosts(agg, version):
   st.header("Most rated hosts")
 
-  rcParams['figure.figsize'] = 15,7
-  ranked = df.groupby(['host_name'])['number_of_reviews'].count().sort_values(ascending=False).reset_index()
-  ranked = ranked.head(5)
-  sns.set_style("whitegrid")
-  fig = sns.barplot(y='host_name', x='number_of_reviews', data=ranked,palette="Blues_d",)
-  fig.set_xlabel("Nº de Reviews",fontsize=10)
-  fig.set_ylabel("Host",fontsize=10)
-
-  st.pyplot()
+  ranked = agg["hosts"]
+  st.image(figures.render(figures.host_bars, ranked, version, figsize=(15, 7), font_scale=1.5), use_column_width=True)
 
   st.write(f"""The host **{ranked.iloc[0].host_name}** is at the top with {ranked.iloc[0].number_of_reviews} reviews.
   **{ranked.iloc[1].host_name}** is second with {ranked.iloc[1].number_of_reviews} reviews. It should also be noted that reviews are not positive or negative reviews, but a count of feedbacks provided for the accommodation.""")
 
 
-  #################### DEMAND AND PRICE ANALYIS ######################
+#################### DEMAND AND PRICE ANALYIS ######################
 
+def demand_and_price(df, version):
   st.header("Demand and Price Analysis")
 
   st.markdown("In this section, we will analyse the demand for Airbnb listings in New York City. We will look at demand over the years since the inception of Airbnb in 2010 and across months of the year to understand seasonlity. We also wish to establish a relation between price and demand. The question we aspire to answer is whether prices of listings fluctuate with demand. We will also conduct a more granular analysis to understand how prices vary by days of the week.")
   st.markdown("To study the demand, since we did not have data on the bookings made over the past year, we will use **number of reviews** variable as the indicator for demand. As per Airbnb, about 50% of guests review the hosts/listings, hence studying the number of review will give us a good estimation of the demand.")
 
-  accommodation = st.radio("Room Type", df.room_type.unique())
+  accommodation = st.radio("Room Type", df.room_type.cat.categories.tolist())
 
   all_accommodation = st.checkbox('All Accommodations')
 
-  demand_df = df[df.last_review.notnull()]
-  demand_df.loc[:,'last_review'] = pd.to_datetime(demand_df.loc[:,'last_review'])
-  price_corr_df = demand_df
-
-  if all_accommodation:
-    demand_df = df[df.last_review.notnull()]
-    demand_df.loc[:,'last_review'] = pd.to_datetime(demand_df.loc[:,'last_review'])
-  else:
-    demand_df = demand_df.query(f"""room_type==@accommodation""")
-
-  fig = px.scatter(demand_df, x="last_review", y="number_of_reviews", color="room_type")
-  fig.update_yaxes(title="Nª Reviews")
-  fig.update_xaxes(title="Last Review Dates")
+  fig = get_scatter(version, "last_review", "number_of_reviews", "room_type", "Last Review Dates", "Nª Reviews",
+                    room_type=None if all_accommodation else accommodation)
   st.plotly_chart(fig)
 
   st.markdown("The number of unique listings receiving reviews has increased over the years. Highly rated locations also tend to be the most expensive ones. We can see an almost exponential increase in the number of reviews, which as discussed earlier, indicates an exponential increase in the demand.")
 
   st.markdown("But about the price ? We also can show the same plot, but this time we take into account the **price** feature along years. Again we use **last review dates** to modeling time series in order to achieve a proportion between price over the years. Let's check it out.")
 
-  fig = px.scatter(price_corr_df, x="last_review", y="price", color="neighbourhood_group")
-  fig.update_yaxes(title="Price ($)")
-  fig.update_xaxes(title="Last Review Dates")
+  fig = get_scatter(version, "last_review", "price", "neighbourhood_group", "Last Review Dates", "Price ($)")
   st.plotly_chart(fig)
 
   st.markdown("The price smoothly increases along the years if we take into account the number of reviews according the borough. Sightly Manhattan it's most expensive borough followed by Brooklyn, some listings apear also as outliers in past 2 years. Let's take a look again in the number of reviews, but this time we group by boroughs.")
 
-  fig = px.scatter(price_corr_df, x="last_review", y="number_of_reviews", color="neighbourhood_group")
-  fig.update_yaxes(title="Nª Reviews")
-  fig.update_xaxes(title="Last Review Dates")
+  fig = get_scatter(version, "last_review", "number_of_reviews", "neighbourhood_group", "Last Review Dates", "Nª Reviews")
   st.plotly_chart(fig)
 
   st.markdown("The number of reviews for Queens appears more often. We get some insights here. 1)  the room type most sought in Queens is the **private room** (as seen in the previous plot). 2)  the price range in Queens is below Manhattan, so perhaps the Queens contemplate the _\"best of both worlds\"_ being the most cost-effective district.")
 
   st.markdown("But there is some correlation between reviews increase and prices? Let's check it out.")
 
-  fig = px.scatter(price_corr_df, y="price", x="number_of_reviews", color="neighbourhood_group")
-  fig.update_xaxes(title="Nª Reviews")
-  fig.update_yaxes(title="Price ($)")
+  fig = get_scatter(version, "number_of_reviews", "price", "neighbourhood_group", "Nª Reviews", "Price ($)")
   st.plotly_chart(fig)
 
   st.markdown("Well, actually does not happens a correlation between reviews and price apparently, the cheaper the more opinions he has. Another point is,  Queens has more reviews than others, which reinforces our theory about being the most cost-effective district.")
 
 
+def most_rated_listings(df, version):
   st.header("Most Rated Listings")
   st.markdown("We can slide to filter a range of numbers in the sidebar to view properties whose review count falls in that range.")
 
   reviews = st.slider('', 0, 12000, (100))
 
-  df.query(f"number_of_reviews<={reviews}").sort_values("number_of_reviews", ascending=False)\
-  .head(50)[["number_of_reviews", "price", "neighbourhood", "room_type", "host_name"]]
+  st.dataframe(get_most_rated(version, reviews))
 
   st.write("654 is the highest number of reviews and only a single property has it. In general, listings with more than 400 reviews are priced below $ 100,00. Some are between $100,00 and $200,00, and only one is priced above $200,00.")
 
 
-  ############################# PRICE DISTRIBUTION ###########################
+############################# PRICE DISTRIBUTION ###########################
 
+def price_distribution(agg, version):
   st.header("Price Distribution")
 
   st.markdown("Bellow we can select a custom price range from the side bar to update the histogram below and check the distribution skewness.")
   st.write("""Select a custom price range from the side bar to update the histogram below.""")
-  values = st.slider("Faixa de Preço", float(df.price.min()), float(df.price.clip(upper=1000.).max()), (50., 300.))
-  f = px.histogram(df.query(f"price.between{values}"), x="price", nbins=100, title="Price distribution")
-  f.update_xaxes(title="Price")
-  f.update_yaxes(title="No. of listings")
+  price_min, price_max = agg["price_range"]
+  values = st.slider("Faixa de Preço", price_min, min(price_max, 1000.), (50., 300.))
+  f = get_histogram(version, values)
   st.plotly_chart(f, color='lifeExp')
 
-  @st.cache
-  def get_availability(show_exp, neighborhood):
-    return df.query(f"""neighbourhood_group==@neighborhood{show_exp}\
-    and availability_365>0""").availability_365.describe(\
-    percentiles=[.1, .25, .5, .75, .9, .99]).to_frame().T
 
+############################# OVER TIME ###########################
+
+def over_time():
+  snapshots = tuple(store.snapshots())
+  if len(snapshots) < 2:
+    return
 
-  ############################# CONCLUSIONS ###########################
+  st.header("Price and Availability over Time")
+  st.markdown(f"Comparing the {len(snapshots)} listings snapshots in the store, from {snapshots[0]} to {snapshots[-1]}, by borough.")
 
+  history = get_history(snapshots)
+  for column, title in [("price", "Median price ($)"), ("availability_365", "Median availability (days)")]:
+    fig = px.line(history[column], x="snapshot", y="p50", color="neighbourhood_group")
+    fig.update_xaxes(title="Snapshot")
+    fig.update_yaxes(title=title)
+    st.plotly_chart(fig)
+
+
+############################# CONCLUSIONS ###########################
+
+def conclusions(version, cols, listing_filter):
   st.header("Conclusions")
 
   st.markdown("Through this exploratory data analysis and visualization project, we gained several interesting insights into the Airbnb rental market. Below we will summarise the answers to the questions that we wished to answer at the beginning of the project:")
@@ -312,13 +380,68 @@ def main():
 
   st.markdown(" Below the data used in this research is available to reproducible research.")
 
-  st.markdown(get_table_download_link(df), unsafe_allow_html=True)
+  st.markdown("_**Note:** The export follows the columns selected in **What you looking for?** and the **Listing Locations** filters._")
+  export_format = st.selectbox("Format", list(export.FORMATS))
+  # a prepared link stays until the columns, filters or format change
+  key = (version, tuple(cols), listing_filter, export_format)
+  link = export.cached_link(key)
+  if link is None and st.button("Prepare download"):
+    link = export.cache_link(key, get_export_link(*key))
+  if link is not None:
+    st.markdown(link, unsafe_allow_html=True)
+
 
-  ################################## FOOTER ##################################
+################################## FOOTER ##################################
 
+def footer():
   st.markdown('-----------------------------------------------------')
   st.text('Developed by Toni Esteves - 2020')
   st.text('Mail: toni.esteves@gmail.com')
 
+
+def main():
+  sidebar()
+  with profiling.Profiler(st.sidebar.checkbox("Profile sections")) as profiler:
+    with profiler.section("Data load"):
+      version = ingest.dataset_version()
+      df = get_data(version)
+      agg = get_aggregates(version)
+      get_search_index(version)  # built at load so no query pays for it
+
+    with profiler.section("Summary"):
+      summary(df)
+    with profiler.section("Listing Locations"):
+      listing_filter = listing_locations(df, agg, version)
+    with profiler.section("What you looking for?"):
+      cols = areas_of_interest(df)
+    with profiler.section("Search"):
+      listing_search(df, version, listing_filter, cols)
+    with profiler.section("Districts"):
+      districts(agg, version)
+    with profiler.section("Availability"):
+      availability(df, version)
+    with profiler.section("Room Types"):
+      room_types(agg, version)
+    with profiler.section("Average Price"):
+      average_price(agg)
+    with profiler.section("Most Rated Hosts"):
+      most_rated_hosts(agg, version)
+    with profiler.section("Demand and Price"):
+      demand_and_price(df, version)
+    with profiler.section("Most Rated Listings"):
+      most_rated_listings(df, version)
+    with profiler.section("Price Distribution"):
+      price_distribution(agg, version)
+    with profiler.section("Over Time"):
+      over_time()
+    with profiler.section("Conclusions"):
+      conclusions(version, cols, listing_filter)
+    footer()
+
+    if profiler.enabled:
+      st.sidebar.subheader("Profile")
+      st.sidebar.table(profiler.report())
+
+
 if __name__ == '__main__':
 	main()
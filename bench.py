@@ -0,0 +1,238 @@
+"""Headless benchmark of app.py
+
+Runs main() outside of Streamlit against synthetic listings with the schema
+of data/listings.csv, replaying scripted widget changes. For every dataset
+size it reports the cold start (csv ingest), the warm start (parquet already
+built, empty caches), the rerun latency and frontend payload of each
+interaction, and the peak resident memory. The csv is generated up front and
+each size runs the app in its own process, so the memory figure is the app's
+alone and does not leak between sizes.
+
+  > python bench.py --rows 50000 500000 5000000 --output bench_results.json
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+
+BOROUGHS = ["Manhattan", "Brooklyn", "Queens", "Bronx", "Staten Island"]
+BOROUGH_WEIGHTS = [.44, .41, .12, .02, .01]
+ROOM_TYPES = ["Entire home/apt", "Private room", "Shared room", "Hotel room"]
+ROOM_WEIGHTS = [.52, .44, .025, .015]
+ADJECTIVES = ["Cozy", "Sunny", "Spacious", "Charming", "Modern", "Quiet", "Bright", "Luxury", "Renovated", "Huge"]
+
+# (widget, label) -> value, replayed in order; every change is kept, like a session
+INTERACTIONS = [
+  (("slider", "Price Range ($)"), (100., 3000.)),
+  (("slider", "Minimum Nights"), 5),
+  (("slider", "Minimum Reviews"), 20),
+  (("radio", "District"), 1),
+  (("checkbox", "Expensive Listings"), True),
+  (("radio", "Room Type"), 1),
+  (("checkbox", "All Accommodations"), True),
+  (("slider", ""), 500),
+  (("slider", "Faixa de Preço"), (20., 800.)),
+  (("multiselect", ""), ["price", "room_type", "host_name", "availability_365"]),
+  (("text_input", "Listing name or host name"), "private brooklyn"),
+  (("selectbox", "Search room type"), 2),
+  (("number_input", "Page"), 2),
+]
+
+
+def synthetic_listings(rows, seed=0):
+  """Random listings with the columns and value ranges of listings.csv
+  in:  number of rows, random seed
+  out: dataframe
+  """
+  rng = np.random.RandomState(seed)
+  boroughs = rng.choice(len(BOROUGHS), rows, p=BOROUGH_WEIGHTS)
+  rooms = rng.choice(len(ROOM_TYPES), rows, p=ROOM_WEIGHTS)
+  hosts = rng.randint(0, max(rows // 5, 1), rows)
+  reviews = rng.geometric(.05, rows) - 1
+  last_review = pd.Timestamp("2011-01-01") + pd.to_timedelta(rng.randint(0, 3300, rows), unit="D")
+
+  return pd.DataFrame({
+    "id": np.arange(2539, 2539 + rows),
+    "name": [f"{ADJECTIVES[a]} {ROOM_TYPES[r]} in {BOROUGHS[b]}" for a, r, b in zip(rng.randint(0, len(ADJECTIVES), rows), rooms, boroughs)],
+    "host_id": 1000 + hosts,
+    "host_name": [f"Host {h}" for h in hosts],
+    "neighbourhood_group": np.array(BOROUGHS)[boroughs],
+    "neighbourhood": [f"{BOROUGHS[b]} {n}" for b, n in zip(boroughs, rng.randint(0, 45, rows))],
+    "latitude": 40.5 + .4 * rng.rand(rows),
+    "longitude": -74.25 + .55 * rng.rand(rows),
+    "room_type": np.array(ROOM_TYPES)[rooms],
+    "price": np.clip(rng.lognormal(4.7, .7, rows), 0, 10000).astype(int),
+    "minimum_nights": rng.geometric(.3, rows),
+    "number_of_reviews": reviews,
+    "last_review": np.where(reviews > 0, last_review.strftime("%Y-%m-%d"), None),
+    "reviews_per_month": np.where(reviews > 0, np.round(rng.exponential(1.4, rows), 2), np.nan),
+    "calculated_host_listings_count": rng.geometric(.6, rows),
+    "availability_365": np.where(rng.rand(rows) < .35, 0, rng.randint(1, 366, rows)),
+  })
+
+
+_encoded_images = {}
+
+
+def encoded_image_size(image, width=None):
+  """Bytes of a PIL image resized to its displayed width and png encoded,
+  memoized so static images are not re-encoded inside the timed reruns"""
+  key = (id(image), width)
+  if key not in _encoded_images:
+    if width and width < image.size[0]:
+      image = image.resize((width, round(image.size[1] * width / image.size[0])))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    _encoded_images[key] = len(buffer.getvalue())
+  return _encoded_images[key]
+
+
+def payload_size(obj, width=None):
+  """Rough size in bytes of what Streamlit would send for an element"""
+  if obj is None:
+    return 0
+  if isinstance(obj, bytes):
+    return len(obj)
+  if isinstance(obj, (pd.DataFrame, pd.Series)):
+    return len(obj.to_json())
+  if hasattr(obj, "to_json"):
+    return len(obj.to_json())
+  if hasattr(obj, "size") and hasattr(obj, "mode"):  # PIL image
+    return encoded_image_size(obj, width)
+  return len(str(obj).encode())
+
+
+class HeadlessStreamlit:
+  """Stands in for the streamlit module inside app.py: widgets answer from
+  the scripted state, elements only add up their payload size"""
+
+  def __init__(self):
+    self.state = {}
+    self.payload = 0
+    self.elements = 0
+    self.sidebar = self
+
+  def _element(self, obj=None, *args, **kwargs):
+    self.payload += payload_size(obj, kwargs.get("width"))
+    self.elements += 1
+
+  title = header = subheader = markdown = text = write = _element
+  dataframe = table = image = map = pydeck_chart = plotly_chart = _element
+
+  def slider(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+    return self.state.get(("slider", label), value)
+
+  def radio(self, label, options, *args, **kwargs):
+    return list(options)[self.state.get(("radio", label), 0)]
+
+  def selectbox(self, label, options, *args, **kwargs):
+    return list(options)[self.state.get(("selectbox", label), 0)]
+
+  def checkbox(self, label, value=False, *args, **kwargs):
+    return self.state.get(("checkbox", label), value)
+
+  def multiselect(self, label, options, default=None, *args, **kwargs):
+    return self.state.get(("multiselect", label), default)
+
+  def text_input(self, label, value="", *args, **kwargs):
+    return self.state.get(("text_input", label), value)
+
+  def number_input(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+    return self.state.get(("number_input", label), value)
+
+  def button(self, label, *args, **kwargs):
+    return self.state.get(("button", label), False)
+
+
+def rerun(app, st):
+  st.payload = st.elements = 0
+  start = time.perf_counter()
+  app.main()
+  return {"seconds": time.perf_counter() - start, "payload_bytes": st.payload, "elements": st.elements}
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def prepare_workdir(rows):
+  """Scratch directory with a synthetic data/listings.csv and the profile
+  picture, generated by the parent so the measured process only runs the app
+  in:  number of rows
+  out: directory path
+  """
+  workdir = tempfile.mkdtemp(prefix="airbnb-bench-")
+  os.makedirs(os.path.join(workdir, "data"))
+  shutil.copy(os.path.join(HERE, "profile.png"), workdir)
+  synthetic_listings(rows).to_csv(os.path.join(workdir, "data", "listings.csv"), index=False)
+  return workdir
+
+
+def run_size(rows, workdir):
+  """Benchmarks one dataset size in a prepared scratch directory
+  in:  number of rows, prepare_workdir output
+  out: results dict
+  """
+  os.chdir(workdir)
+
+  sys.path.insert(0, HERE)
+  import app
+  import figures
+  from streamlit import caching
+
+  st = app.st = HeadlessStreamlit()
+  results = {"rows": rows, "cold_start": rerun(app, st)}
+
+  caching.clear_cache()
+  figures._images.clear()
+  results["warm_start"] = rerun(app, st)
+
+  results["interactions"] = []
+  for key, value in INTERACTIONS:
+    st.state[key] = value
+    results["interactions"].append(dict(widget=key[0], label=key[1], **rerun(app, st)))
+
+  # ru_maxrss is in kilobytes on Linux
+  results["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+  return results
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--rows", type=int, nargs="+", default=[50000, 500000, 5000000])
+  parser.add_argument("--output", default="bench_results.json")
+  parser.add_argument("--workdir", help=argparse.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.workdir:
+    print(json.dumps(run_size(args.rows[0], args.workdir)))
+    return
+
+  results = []
+  for rows in args.rows:
+    workdir = prepare_workdir(rows)
+    try:
+      out = subprocess.run([sys.executable, os.path.abspath(__file__), "--workdir", workdir, "--rows", str(rows)],
+                           check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    finally:
+      shutil.rmtree(workdir, ignore_errors=True)
+    result = json.loads(out.strip().splitlines()[-1])
+    results.append(result)
+    print(f"{rows:>9} rows  cold {result['cold_start']['seconds']:.2f}s  warm {result['warm_start']['seconds']:.2f}s  "
+          f"rerun {np.median([i['seconds'] for i in result['interactions']]):.3f}s  "
+          f"peak {result['peak_rss_bytes'] / 2 ** 20:.0f}MB")
+
+  with open(args.output, "w") as f:
+    json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,109 @@
+import base64
+from collections import OrderedDict
+import gzip
+import io
+import threading
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+FORMATS = {
+  "csv.gz": "application/gzip",
+  "parquet": "application/octet-stream",
+}
+
+MAX_CACHED_BYTES = 64 * 2 ** 20
+
+_links = OrderedDict()
+_links_size = 0
+_links_lock = threading.Lock()
+
+
+def iter_chunks(df, rows, columns, chunksize=50000):
+  """Yields the selected rows and columns a chunk at a time, so the full
+  selection is never copied at once
+  in:  dataframe, row positions, column names, rows per chunk
+  out: dataframe chunks
+  """
+  for start in range(0, max(len(rows), 1), chunksize):
+    yield df.iloc[rows[start:start + chunksize]][columns]
+
+
+def parquet_schema(template):
+  """Arrow schema of the exported columns, object columns typed as strings
+  so a chunk that happens to be all null is not inferred as null type
+  in:  empty dataframe with the exported columns
+  out: pyarrow schema
+  """
+  schema = pa.Schema.from_pandas(template, preserve_index=False)
+  fields = [pa.field(field.name, pa.string()) if template[field.name].dtype == object else field
+            for field in schema]
+  return pa.schema(fields, metadata=schema.metadata)
+
+
+def write_csv_gz(chunks, sink, template):
+  with gzip.GzipFile(fileobj=sink, mode="wb") as gz:
+    for i, chunk in enumerate(chunks):
+      gz.write(chunk.to_csv(sep='\t', decimal=',', index=False, header=i == 0).encode())
+
+
+def write_parquet(chunks, sink, template):
+  schema = parquet_schema(template)
+  writer = pq.ParquetWriter(sink, schema, compression="snappy")
+  for chunk in chunks:
+    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+  writer.close()
+
+
+WRITERS = {
+  "csv.gz": write_csv_gz,
+  "parquet": write_parquet,
+}
+
+
+def export(df, rows, columns, fmt, chunksize=50000):
+  """Serializes the selected rows and columns chunk by chunk
+  in:  dataframe, row positions, column names, one of FORMATS
+  out: compressed file bytes
+  """
+  sink = io.BytesIO()
+  WRITERS[fmt](iter_chunks(df, rows, columns, chunksize), sink, df.iloc[:0][columns])
+  return sink.getvalue()
+
+
+def download_link(data, fmt, name="listings"):
+  """Generates a link allowing an exported file to be downloaded
+  in:  file bytes, one of FORMATS
+  out: href string
+  """
+  b64 = base64.b64encode(data).decode()
+  return f'<a href="data:{FORMATS[fmt]};base64,{b64}" download="{name}.{fmt}">Download</a>'
+
+
+def cached_link(key):
+  """Download link previously prepared for key, if still cached"""
+  with _links_lock:
+    if key in _links:
+      _links.move_to_end(key)
+    return _links.get(key)
+
+
+def cache_link(key, link):
+  """Keeps a prepared link in an LRU bounded by MAX_CACHED_BYTES in total.
+  Links larger than the bound are returned without being cached
+  in:  cache key, href string
+  out: the same href string
+  """
+  global _links_size
+  if len(link) > MAX_CACHED_BYTES:
+    return link
+
+  with _links_lock:
+    if key not in _links:
+      _links[key] = link
+      _links_size += len(link)
+    while _links_size > MAX_CACHED_BYTES:
+      _, evicted = _links.popitem(last=False)
+      _links_size -= len(evicted)
+
+  return link
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+import io
+import threading
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from  matplotlib.ticker import PercentFormatter
+import seaborn as sns
+
+
+MAX_FIGURES = 32
+
+_images = OrderedDict()
+_images_lock = threading.Lock()
+_render_lock = threading.Lock()  # seaborn styles are applied through the global rcParams
+
+
+def district_bars(ax, district_price):
+  sns.barplot(x='neighbourhood_group', y='price', data=district_price, ax=ax,
+              order=district_price.neighbourhood_group.tolist(), palette="Blues_d")
+  ax.set_xlabel("District", fontsize=10)
+  ax.set_ylabel("Price ($)", fontsize=10)
+
+
+def room_type_bars(ax, room_types_df):
+  sns.barplot(y='Percentage', x='District', hue="Room Type", data=room_types_df, ax=ax, palette="muted")
+  ax.set(ylim=(0, 100))
+  ax.yaxis.set_major_formatter(PercentFormatter(100))
+
+
+def host_bars(ax, ranked):
+  sns.barplot(y='host_name', x='number_of_reviews', data=ranked, ax=ax, palette="Blues_d")
+  ax.set_xlabel("Nº de Reviews", fontsize=10)
+  ax.set_ylabel("Host", fontsize=10)
+
+
+def render(draw, data, version, figsize=(6.4, 4.8), style="whitegrid", font_scale=1., dpi=100):
+  """Renders a chart on its own figure and keeps the png bytes in a bounded
+  LRU cache keyed by chart, dataset version and style
+  in:  draw function taking (ax, data), its data, dataset version, style parameters
+  out: png bytes
+  """
+  key = (draw.__name__, version, figsize, style, font_scale, dpi)
+
+  with _images_lock:
+    if key in _images:
+      _images.move_to_end(key)
+      return _images[key]
+
+  with _render_lock, sns.axes_style(style), sns.plotting_context("notebook", font_scale=font_scale):
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    draw(fig.add_subplot(1, 1, 1), data)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+
+  with _images_lock:
+    _images[key] = buffer.getvalue()
+    while len(_images) > MAX_FIGURES:
+      _images.popitem(last=False)
+
+  return buffer.getvalue()
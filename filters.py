@@ -0,0 +1,67 @@
+import numpy as np
+
+
+RANGES = ["price", "minimum_nights", "number_of_reviews"]
+EQUALITIES = ["room_type", "neighbourhood_group"]
+
+
+def _sorted_column(series):
+  values = series.to_numpy()
+  order = np.argsort(values, kind="mergesort")
+  return {"order": order, "values": values[order], "valid": int(series.notnull().sum())}
+
+
+def _bitmaps(series):
+  codes = series.astype("category").cat
+  return {category: codes.codes.to_numpy() == code for code, category in enumerate(codes.categories)}
+
+
+def build_index(df, ranges=RANGES, equalities=EQUALITIES):
+  """Pre-sorted columns for range predicates and bitmaps for equality ones
+  in:  dataframe, range columns, equality columns
+  out: index dict
+  """
+  return {
+    "size": len(df),
+    "ranges": {col: _sorted_column(df[col]) for col in ranges},
+    "bitmaps": {col: _bitmaps(df[col]) for col in equalities},
+  }
+
+
+def _bounds(column, lo, hi):
+  start = 0 if lo is None else np.searchsorted(column["values"][:column["valid"]], lo, side="left")
+  stop = column["valid"] if hi is None else np.searchsorted(column["values"][:column["valid"]], hi, side="right")
+  return start, stop
+
+
+def select(index, **predicates):
+  """Boolean row mask matching every predicate. A (lo, hi) tuple is an
+  inclusive range, None leaving that side open, anything else is equality
+  in:  index dict, column=predicate keywords
+  out: numpy boolean mask
+  """
+  mask = np.ones(index["size"], dtype=bool)
+
+  for col, value in predicates.items():
+    if isinstance(value, tuple):
+      column = index["ranges"][col]
+      start, stop = _bounds(column, *value)
+      matched = np.zeros(index["size"], dtype=bool)
+      matched[column["order"][start:stop]] = True
+    else:
+      matched = index["bitmaps"][col].get(value)
+      if matched is None:
+        return np.zeros(index["size"], dtype=bool)
+    mask &= matched
+
+  return mask
+
+
+def largest(index, col, n, lo=None, hi=None):
+  """Row positions of the n largest values of a column inside [lo, hi]
+  in:  index dict, range column, number of rows, optional bounds
+  out: numpy array of positions, largest first
+  """
+  column = index["ranges"][col]
+  start, stop = _bounds(column, lo, hi)
+  return column["order"][max(start, stop - n):stop][::-1]
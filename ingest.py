@@ -0,0 +1,82 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+SOURCE = "data/listings.csv"
+CACHE = "data/listings.parquet"
+
+CATEGORIES = ["neighbourhood_group", "neighbourhood", "room_type"]
+INTEGERS = ["id", "host_id", "price", "minimum_nights", "number_of_reviews",
+            "calculated_host_listings_count", "availability_365"]
+FLOATS = ["reviews_per_month"]
+
+VERSION_KEY = b"listings_version"
+
+
+def dataset_version(source=SOURCE):
+  """Cheap signature of the source file, used as cache key by the app
+  in:  csv path
+  out: (mtime, size) tuple
+  """
+  stat = os.stat(source)
+  return stat.st_mtime_ns, stat.st_size
+
+
+def read_listings_csv(source=SOURCE):
+  """Parses a listings csv with explicit dtypes
+  in:  csv path
+  out: typed dataframe
+  """
+  df = pd.read_csv(source, dtype={c: "category" for c in CATEGORIES},
+                   parse_dates=["last_review"])
+
+  for col in INTEGERS:
+    if col in df and not df[col].isnull().any():
+      df[col] = pd.to_numeric(df[col], downcast="integer")
+
+  for col in FLOATS:
+    if col in df:
+      df[col] = df[col].astype("float32")
+
+  return df
+
+
+def cached_version(cache=CACHE):
+  """dataset_version of the csv the parquet cache was built from
+  in:  parquet path
+  out: version bytes, None when there is no cache
+  """
+  if not os.path.exists(cache):
+    return None
+  return (pq.read_schema(cache).metadata or {}).get(VERSION_KEY)
+
+
+def ingest(source=SOURCE, cache=CACHE):
+  """Converts the csv into the parquet cache unless the cache was built
+  from this very version of the csv. Versions are compared for equality,
+  a replaced csv may well carry an older mtime (wget, rsync -t, cp -p)
+  in:  csv path, parquet path
+  out: parquet path
+  """
+  version = repr(dataset_version(source)).encode()  # taken before reading, a csv changed meanwhile is rebuilt next time
+  if cached_version(cache) == version:
+    return cache
+
+  table = pa.Table.from_pandas(read_listings_csv(source), preserve_index=False)
+  table = table.replace_schema_metadata({**(table.schema.metadata or {}), VERSION_KEY: version})
+
+  tmp = f"{cache}.{os.getpid()}.tmp"
+  pq.write_table(table, tmp)
+  os.replace(tmp, cache)  # atomic, concurrent workers never see a partial file
+
+  return cache
+
+
+def load_listings(source=SOURCE, cache=CACHE, columns=None):
+  """Loads the listings from the columnar cache, refreshing it if needed
+  in:  csv path, parquet path, optional column subset
+  out: typed dataframe
+  """
+  return pd.read_parquet(ingest(source, cache), engine="pyarrow", columns=columns)
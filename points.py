@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pydeck as pdk
+
+
+MAX_POINTS = 5000
+WEBGL_ROWS = 1000
+
+
+def _numeric(series):
+  if pd.api.types.is_datetime64_any_dtype(series):
+    return series.astype("int64").astype("float64").to_numpy()
+  return series.astype("float64").to_numpy()
+
+
+def _restore(values, like):
+  if pd.api.types.is_datetime64_any_dtype(like):
+    return pd.to_datetime(values.astype("int64"))
+  return values
+
+
+def _codes(values, resolution):
+  span = values.max() - values.min()
+  return ((values - values.min()) / (span or 1) * (resolution - 1)).astype("int64")
+
+
+def reduce_points(df, x, y, by=None, max_points=MAX_POINTS, resolution=1024):
+  """Bins points on a 2D grid, coarsening it until at most max_points cells
+  remain. Each occupied cell keeps the mean position of its points, so an
+  isolated outlier is still drawn where it is
+  in:  dataframe, x and y columns, optional grouping column, point cap
+  out: dataframe with x, y, the grouping column and a count per point
+  """
+  points = df[[x, y] + ([by] if by else [])].dropna(how="any")
+  if len(points) <= max_points:
+    return points.assign(count=1)
+
+  xs, ys = _numeric(points[x]), _numeric(points[y])
+  cells = pd.DataFrame({"x_bin": _codes(xs, resolution), "y_bin": _codes(ys, resolution),
+                        "x_sum": xs, "y_sum": ys, "count": 1})
+  keys = ["x_bin", "y_bin"]
+  if by:
+    cells[by] = points[by].to_numpy()
+    keys.append(by)
+
+  cells = cells.groupby(keys, observed=True, sort=False).sum().reset_index()
+  while len(cells) > max_points and resolution > 1:
+    cells["x_bin"] //= 2
+    cells["y_bin"] //= 2
+    resolution //= 2
+    cells = cells.groupby(keys, observed=True, sort=False).sum().reset_index()
+
+  reduced = pd.DataFrame({
+    x: _restore((cells.x_sum / cells["count"]).to_numpy(), points[x]),
+    y: _restore((cells.y_sum / cells["count"]).to_numpy(), points[y]),
+  })
+  if by:
+    reduced[by] = cells[by].to_numpy()
+  reduced["count"] = cells["count"].to_numpy()
+
+  return reduced
+
+
+def density_map(cells, zoom=10):
+  """Grid density map of the listings, one circle per occupied cell sized
+  by the number of listings in it
+  in:  reduce_points output over latitude and longitude
+  out: pydeck Deck
+  """
+  cells = cells.assign(radius=20 * np.sqrt(cells["count"]))
+
+  layer = pdk.Layer("ScatterplotLayer", data=cells, get_position="[longitude, latitude]",
+                    get_radius="radius", get_fill_color=[200, 30, 0, 160])
+  view = pdk.ViewState(latitude=cells.latitude.mean(), longitude=cells.longitude.mean(), zoom=zoom)
+
+  return pdk.Deck(layers=[layer], initial_view_state=view, map_style="mapbox://styles/mapbox/light-v9")
+
+
+def scatter(df, x, y, color, max_points=MAX_POINTS):
+  """px.scatter over the reduced points, switching to WebGL for large charts
+  in:  dataframe, x, y and color columns, point cap
+  out: plotly figure
+  """
+  reduced = reduce_points(df, x, y, by=color, max_points=max_points)
+  binned = reduced["count"].max() > 1
+
+  return px.scatter(reduced, x=x, y=y, color=color, size="count" if binned else None,
+                    render_mode="webgl" if len(reduced) > WEBGL_ROWS else "svg")
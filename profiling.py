@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+
+_tracing_sessions = 0
+_tracing_lock = threading.Lock()
+
+
+class Profiler:
+  """Wall time and Python allocated memory of named sections of a rerun.
+  Memory tracing is process wide and slows allocations down, so it runs
+  while at least one session is profiling and stops when the last one is
+  done. Memory is the change in traced allocations over a section, which
+  also counts whatever concurrent sessions allocated meanwhile"""
+
+  def __init__(self, enabled):
+    self.enabled = enabled
+    self.records = []
+
+  def __enter__(self):
+    global _tracing_sessions
+    if self.enabled:
+      with _tracing_lock:
+        if _tracing_sessions == 0:
+          tracemalloc.start()
+        _tracing_sessions += 1
+    return self
+
+  def __exit__(self, *exc):
+    global _tracing_sessions
+    if self.enabled:
+      with _tracing_lock:
+        _tracing_sessions -= 1
+        if _tracing_sessions == 0:
+          tracemalloc.stop()
+
+  @contextmanager
+  def section(self, name):
+    if not self.enabled:
+      yield
+      return
+
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      seconds = time.perf_counter() - start
+      self.records.append({
+        "Section": name,
+        "Time (ms)": round(1000 * seconds, 1),
+        "Memory (MB)": round((tracemalloc.get_traced_memory()[0] - before) / 2 ** 20, 2),
+      })
+
+  def report(self):
+    return pd.DataFrame(self.records, columns=["Section", "Time (ms)", "Memory (MB)"])
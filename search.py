@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+TOKEN = r"\w+"
+COLUMNS = ["name", "host_name"]
+PER_PAGE = 20
+
+
+def tokenize(text):
+  return pd.Series([text]).str.lower().str.findall(TOKEN).iat[0]
+
+
+def build_index(df, columns=COLUMNS):
+  """Inverted index of the lowercased word tokens of the given columns.
+  Postings of token code c are rows[offsets[c]:offsets[c + 1]], sorted,
+  with their term frequencies in tf
+  in:  dataframe, text columns
+  out: index dict
+  """
+  tokens = pd.concat([df[col].reset_index(drop=True).fillna("").str.lower().str.findall(TOKEN).explode()
+                      for col in columns]).dropna()
+  codes, vocabulary = pd.factorize(tokens.to_numpy())
+
+  postings = pd.DataFrame({"code": codes, "row": tokens.index.to_numpy()}).groupby(["code", "row"]).size()
+  posting_codes = postings.index.get_level_values("code").to_numpy()
+  offsets = np.searchsorted(posting_codes, np.arange(len(vocabulary) + 1))
+
+  return {
+    "size": len(df),
+    "vocabulary": dict(zip(vocabulary, range(len(vocabulary)))),
+    "offsets": offsets,
+    "rows": postings.index.get_level_values("row").to_numpy(),
+    "tf": postings.to_numpy(),
+  }
+
+
+def search(index, query, mask=None):
+  """Rows containing every token of the query, ranked by tf-idf
+  in:  index dict, query string, optional boolean row mask to restrict to
+  out: numpy array of row positions, best match first
+  """
+  codes = [index["vocabulary"].get(token) for token in set(tokenize(query))]
+  if not codes or None in codes:
+    return np.array([], dtype="int64")
+
+  rows, scores = [], []
+  for code in codes:
+    start, stop = index["offsets"][code], index["offsets"][code + 1]
+    rows.append(index["rows"][start:stop])
+    scores.append(index["tf"][start:stop] * np.log(index["size"] / (stop - start)))
+
+  matches, positions, hits = np.unique(np.concatenate(rows), return_inverse=True, return_counts=True)
+  score = np.bincount(positions, weights=np.concatenate(scores))
+
+  keep = hits == len(codes)
+  if mask is not None:
+    keep &= mask[matches]
+
+  matches, score = matches[keep], score[keep]
+  return matches[np.argsort(-score, kind="mergesort")]
+
+
+def page(rows, number, per_page=PER_PAGE):
+  """Slice of ranked rows for a 1-based page number"""
+  return rows[(number - 1) * per_page:number * per_page]
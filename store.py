@@ -0,0 +1,106 @@
+import os
+import shutil
+import sys
+from urllib.parse import quote, unquote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import ingest
+
+
+ROOT = "data/store"
+SNAPSHOT_URL = "http://data.insideairbnb.com/united-states/ny/new-york-city/{}/visualisations/listings.csv"
+
+
+def _partition(key, value):
+  return f"{key}={quote(str(value), safe='')}"
+
+
+def _value(name):
+  return unquote(name.split("=", 1)[1])
+
+
+def snapshots(root=ROOT):
+  """Snapshot dates already in the store
+  in:  store root
+  out: sorted list of date strings
+  """
+  if not os.path.isdir(root):
+    return []
+  return sorted(_value(name) for name in os.listdir(root)
+                if name.startswith("snapshot=") and not name.endswith(".tmp"))
+
+
+def append_snapshot(snapshot, source=None, root=ROOT):
+  """Adds one dated listings csv to the store, partitioned by borough.
+  Snapshots already stored are left untouched
+  in:  snapshot date, csv path or url (Inside Airbnb by default), store root
+  out: snapshot directory
+  """
+  target = os.path.join(root, _partition("snapshot", snapshot))
+  if os.path.isdir(target):
+    return target
+
+  df = ingest.read_listings_csv(source or SNAPSHOT_URL.format(snapshot))
+
+  tmp = f"{target}.{os.getpid()}.tmp"
+  shutil.rmtree(tmp, ignore_errors=True)
+  os.makedirs(tmp)  # an empty snapshot is stored as a snapshot without partitions
+  for borough, rows in df.groupby("neighbourhood_group", observed=True):
+    partition = os.path.join(tmp, _partition("neighbourhood_group", borough))
+    os.makedirs(partition)
+    rows = rows.drop(columns="neighbourhood_group")
+    pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), os.path.join(partition, "part.parquet"))
+
+  try:
+    os.replace(tmp, target)  # readers never see a half written snapshot
+  except OSError:
+    # another worker stored the same snapshot first, keep theirs
+    shutil.rmtree(tmp, ignore_errors=True)
+    if not os.path.isdir(target):
+      raise
+
+  return target
+
+
+def partitions(root=ROOT, dates=None, boroughs=None):
+  """Partition files matching the requested snapshots and boroughs, the
+  others are never opened
+  in:  store root, optional snapshot dates, optional boroughs
+  out: (snapshot, borough, path) tuples
+  """
+  for snapshot in snapshots(root):
+    if dates is not None and snapshot not in dates:
+      continue
+    directory = os.path.join(root, _partition("snapshot", snapshot))
+    for name in sorted(os.listdir(directory)):
+      borough = _value(name)
+      if boroughs is None or borough in boroughs:
+        yield snapshot, borough, os.path.join(directory, name, "part.parquet")
+
+
+def summarize(column, root=ROOT, dates=None, boroughs=None):
+  """Count, mean and quartiles of a column per snapshot and borough,
+  computed partition by partition so the store is never loaded whole
+  in:  column name, store root, optional snapshot dates and boroughs
+  out: dataframe with a row per partition
+  """
+  rows = []
+  for snapshot, borough, path in partitions(root, dates, boroughs):
+    values = pq.read_table(path, columns=[column]).to_pandas()[column].dropna()
+    rows.append({
+      "snapshot": snapshot,
+      "neighbourhood_group": borough,
+      "count": len(values),
+      "mean": values.mean(),
+      "p25": values.quantile(.25),
+      "p50": values.quantile(.5),
+      "p75": values.quantile(.75),
+    })
+
+  return pd.DataFrame(rows, columns=["snapshot", "neighbourhood_group", "count", "mean", "p25", "p50", "p75"])
+
+
+if __name__ == '__main__':
+  # python store.py 2019-09-12 [csv path]
+  print(append_snapshot(*sys.argv[1:3]))